@@ -110,7 +110,7 @@ def main():
         print("3. Configure environment variables:")
         print("   - DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT")
         print("   - S3_BUCKET, S3_FOLDER, S3_FILE")
-        print("4. Set memory to 1024 MB and timeout to 10 minutes (600 seconds)")
+        print("4. Set memory to 1769 MB (one full vCPU) and timeout to 10 minutes (600 seconds)")
         print("5. Ensure Lambda has:")
         print("   - S3 read permissions (IAM role)")
         print("   - VPC access if database is in VPC")
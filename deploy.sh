@@ -45,5 +45,5 @@ echo "Next steps:"
 echo "1. Upload lambda-deployment.zip to AWS Lambda"
 echo "2. Set handler to: lambda_function.lambda_handler"
 echo "3. Configure environment variables for database credentials"
-echo "4. Set memory to 1024 MB and timeout to 10 minutes"
+echo "4. Set memory to 1769 MB (one full vCPU) and timeout to 10 minutes"
 echo "=========================================="
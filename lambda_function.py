@@ -6,15 +6,41 @@ transforms the data, and loads it into PostgreSQL tables using batch processing
 with UPSERT logic for duplicate handling.
 """
 
+import atexit
+from itertools import chain, groupby
+from operator import itemgetter
 from src.config_manager import ConfigManager
-from src.s3_reader import S3Reader
+from src.s3_reader import S3Reader, create_s3_client
 from src.json_parser import FacebookJSONParser
 from src.data_transformer import DataTransformer
-from src.database_writer import DatabaseWriter
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Initialized once per container and reused across warm invocations
+_CONFIG = ConfigManager()
+_S3 = create_s3_client()
+_DB = None
+
+
+def _close_db():
+    """Close the shared database connection when the container shuts down."""
+    if _DB is not None:
+        _DB.disconnect()
+
+
+atexit.register(_close_db)
+
+
+def _empty_stats():
+    """Return zeroed processing statistics, in the shape of process_batches' result."""
+    return {
+        "total_records": 0,
+        "total_batches": 0,
+        "success": 0,
+        "failed": 0
+    }
+
 
 def lambda_handler(event, context):
     """
@@ -27,6 +53,10 @@ def lambda_handler(event, context):
     Returns:
         dict: Response with status code and processing summary
     """
+    global _DB
+
+    json_file = None
+
     logger.info("=" * 80)
     logger.info("Lambda function execution started")
     logger.info("=" * 80)
@@ -34,18 +64,19 @@ def lambda_handler(event, context):
     try:
         # 1. Load Configuration
         logger.info("Step 1: Loading configuration...")
-        config_manager = ConfigManager()
-        config_manager.validate()
+        _CONFIG.validate()
 
-        s3_config = config_manager.get_s3_config()
-        db_config = config_manager.get_database_config()
-        batch_size = config_manager.get_batch_size()
+        s3_config = _CONFIG.get_s3_config()
+        db_config = _CONFIG.get_database_config()
+        batch_size = _CONFIG.get_batch_size()
 
-        # 2. Read JSON from S3
+        # 2. Read JSON from S3 (the configured file, or every key listed
+        # in the event's "s3_keys")
         logger.info("Step 2: Reading JSON from S3...")
-        s3_reader = S3Reader(s3_config)
+        s3_reader = S3Reader(s3_config, s3_client=_S3)
+        s3_keys = event.get("s3_keys")
 
-        if not s3_reader.file_exists():
+        if not s3_keys and not s3_reader.file_exists():
             error_msg = f"File not found in S3: {s3_reader.get_s3_key()}"
             logger.error(error_msg)
             return {
@@ -53,14 +84,24 @@ def lambda_handler(event, context):
                 'body': {'error': error_msg}
             }
 
-        json_content = s3_reader.read_json_file()
-
         # 3. Parse JSON
         logger.info("Step 3: Parsing JSON content...")
         parser = FacebookJSONParser()
-        posts, comments = parser.parse(json_content)
-
-        if not posts and not comments:
+        if s3_keys:
+            # Files are downloaded concurrently and parsed as each arrives;
+            # every file's posts come before its own comments
+            records = chain.from_iterable(
+                parser.iter_records(content)
+                for _, content in s3_reader.read_json_files(s3_keys)
+            )
+        else:
+            # Downloaded once to /tmp, then streamed from there once for the
+            # posts and once more for the comments
+            json_file = s3_reader.read_json_file()
+            records = parser.iter_records(json_file, buffer_size=s3_reader.read_buffer_size)
+
+        first_record = next(records, None)
+        if first_record is None:
             logger.warning("No posts or comments found in JSON")
             return {
                 'statusCode': 200,
@@ -71,20 +112,16 @@ def lambda_handler(event, context):
                 }
             }
 
-        # 4. Transform and Validate Data
-        logger.info("Step 4: Transforming and validating data...")
-        transformer = DataTransformer(batch_size=batch_size)
-
-        valid_posts = transformer.filter_valid_records(posts, record_type="post")
-        valid_comments = transformer.filter_valid_records(comments, record_type="comment")
+        records = chain([first_record], records)
 
-        posts_batches = transformer.create_batches(valid_posts)
-        comments_batches = transformer.create_batches(valid_comments)
-
-        # 5. Connect to Database
-        logger.info("Step 5: Connecting to database...")
-        db_writer = DatabaseWriter(db_config)
-        db_writer.connect()
+        # 4. Connect to Database (reuses the connection from a warm container)
+        logger.info("Step 4: Connecting to database...")
+        if _DB is None:
+            # Imported here so psycopg2 is only loaded once there is data to write
+            from src.database_writer import DatabaseWriter
+            _DB = DatabaseWriter(db_config)
+        db_writer = _DB
+        db_writer.ensure_connected()
 
         # Verify tables exist
         if not db_writer.verify_tables_exist():
@@ -96,19 +133,32 @@ def lambda_handler(event, context):
                 'body': {'error': error_msg}
             }
 
-        # 6. Process Posts Batches
-        logger.info("Step 6: Processing posts batches...")
-        posts_stats = db_writer.process_batches(posts_batches, batch_type="posts")
+        # 5. Batch and write records as they are parsed (the parser already
+        # drops records without ids). The parser yields every post of a file
+        # before any of its comments, so posts are written before the
+        # comments that reference them.
+        transformer = DataTransformer(batch_size=batch_size)
+        stats = {
+            "posts": _empty_stats(),
+            "comments": _empty_stats()
+        }
+
+        for record_type, group in groupby(records, key=itemgetter(0)):
+            batch_type = f"{record_type}s"
+            logger.info(f"Step 5: Processing {batch_type} batches...")
 
-        # 7. Process Comments Batches
-        logger.info("Step 7: Processing comments batches...")
-        comments_stats = db_writer.process_batches(comments_batches, batch_type="comments")
+            run_stats = db_writer.process_batches(
+                transformer.create_batches(record for _, record in group),
+                batch_type=batch_type
+            )
 
-        # 8. Disconnect from Database
-        logger.info("Step 8: Closing database connection...")
-        db_writer.disconnect()
+            for key, value in run_stats.items():
+                stats[batch_type][key] += value
 
-        # 9. Prepare Response
+        posts_stats = stats["posts"]
+        comments_stats = stats["comments"]
+
+        # 6. Prepare Response
         response = {
             'statusCode': 200,
             'body': {
@@ -149,6 +199,10 @@ def lambda_handler(event, context):
             }
         }
 
+    finally:
+        if json_file is not None:
+            json_file.close()
+
 
 # For local testing
 if __name__ == "__main__":
@@ -1,9 +1,13 @@
-import json
+import copy
 import os
+import orjson
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Parsed config files keyed by (path, mtime_ns), reused across warm invocations
+_CONFIG_CACHE = {}
+
 
 class ConfigManager:
     """
@@ -32,6 +36,10 @@ class ConfigManager:
         """
         Load configuration from file or environment variables.
 
+        A parsed config file is cached until the file's mtime changes; each
+        caller gets its own copy, so changes to one config do not leak into
+        the cache or into other ConfigManager instances.
+
         Args:
             config_path (str): Path to config file
 
@@ -40,17 +48,23 @@ class ConfigManager:
 
         Raises:
             FileNotFoundError: If config file not found
-            json.JSONDecodeError: If config file is malformed
+            orjson.JSONDecodeError: If config file is malformed
         """
         try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+            cache_key = (config_path, os.stat(config_path).st_mtime_ns)
+            if cache_key in _CONFIG_CACHE:
+                return copy.deepcopy(_CONFIG_CACHE[cache_key])
+
+            with open(config_path, 'rb') as f:
+                config = orjson.loads(f.read())
             logger.info(f"Loaded configuration from {config_path}")
-            return config
+
+            _CONFIG_CACHE[cache_key] = config
+            return copy.deepcopy(config)
         except FileNotFoundError:
             logger.warning(f"Config file not found at {config_path}, loading from environment variables")
             return self._load_from_env()
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Malformed JSON in config file: {e}")
             raise
 
@@ -65,14 +79,16 @@ class ConfigManager:
             "s3": {
                 "bucket_name": os.getenv("S3_BUCKET_NAME"),
                 "folder_path": os.getenv("S3_FOLDER_PATH", ""),
-                "file_name": os.getenv("S3_FILE_NAME")
+                "file_name": os.getenv("S3_FILE_NAME"),
+                "read_buffer_size": int(os.getenv("S3_READ_BUFFER_SIZE", 8 * 1024 * 1024))
             },
             "database": {
                 "host": os.getenv("DB_HOST"),
                 "database": os.getenv("DB_NAME"),
                 "username": os.getenv("DB_USERNAME"),
                 "password": os.getenv("DB_PASSWORD"),
-                "port": int(os.getenv("DB_PORT", 5432))
+                "port": int(os.getenv("DB_PORT", 5432)),
+                "copy_threshold": int(os.getenv("DB_COPY_THRESHOLD", 250))
             },
             "batch_size": int(os.getenv("BATCH_SIZE", 1000))
         }
@@ -1,5 +1,15 @@
+from itertools import islice
 from src.logger import get_logger
 
+try:
+    from itertools import batched
+except ImportError:
+    def batched(iterable, n):
+        """Fallback for Python versions before 3.12, which lack itertools.batched."""
+        iterator = iter(iterable)
+        while batch := tuple(islice(iterator, n)):
+            yield batch
+
 logger = get_logger(__name__)
 
 
@@ -20,102 +30,99 @@ class DataTransformer:
 
     def create_batches(self, data):
         """
-        Split data into batches of specified size.
+        Lazily split data into batches of specified size.
+
+        Accepts any iterable (including generators), so only one batch needs
+        to be held in memory at a time. Lists are sliced directly; other
+        iterables are grouped with itertools.batched.
 
         Args:
-            data (list): List of records (posts or comments)
+            data (iterable): Records (posts or comments)
 
-        Returns:
-            list: List of batches, where each batch is a list of records
+        Yields:
+            list or tuple: Batch of up to batch_size records (a list for list input)
 
         Example:
             Input: [1,2,3,4,5], batch_size=2
-            Output: [[1,2], [3,4], [5]]
+            Output: [1,2], [3,4], [5]
         """
-        if not data:
-            logger.warning("No data provided for batching")
-            return []
+        batch_size = self.batch_size
 
-        batches = []
-        for i in range(0, len(data), self.batch_size):
-            batch = data[i:i + self.batch_size]
-            batches.append(batch)
+        if isinstance(data, list):
+            for start in range(0, len(data), batch_size):
+                yield data[start:start + batch_size]
+            return
 
-        logger.info(f"Created {len(batches)} batches from {len(data)} records")
-        return batches
+        yield from batched(data, batch_size)
 
-    def validate_post(self, post):
+    @staticmethod
+    def validate_post(post):
         """
-        Validate that a post record has all required fields.
+        Validate that a post record has a post_id.
+
+        Records built by FacebookJSONParser always carry every field and, with
+        strict_validate (the default), are already checked during extraction;
+        this is for other records.
 
         Args:
-            post (dict): Post record
+            post (Post): Post record
 
         Returns:
             bool: True if valid, False otherwise
         """
-        required_fields = ["post_id", "timestamp", "title", "post_texts", "text_length"]
-
-        for field in required_fields:
-            if field not in post:
-                logger.warning(f"Post missing required field: {field}")
-                return False
-
-        if not post["post_id"]:
-            logger.warning("Post has empty post_id")
-            return False
-
-        return True
+        return bool(post.post_id)
 
-    def validate_comment(self, comment):
+    @staticmethod
+    def validate_comment(comment):
         """
-        Validate that a comment record has all required fields.
+        Validate that a comment record has a comment_id and post_id.
+
+        Records built by FacebookJSONParser always carry every field and, with
+        strict_validate (the default), are already checked during extraction;
+        this is for other records.
 
         Args:
-            comment (dict): Comment record
+            comment (Comment): Comment record
 
         Returns:
             bool: True if valid, False otherwise
         """
-        required_fields = ["comment_id", "post_id", "timestamp", "author", "comment_texts", "text_length"]
+        return bool(comment.comment_id and comment.post_id)
 
-        for field in required_fields:
-            if field not in comment:
-                logger.warning(f"Comment missing required field: {field}")
-                return False
+    def iter_valid(self, records, record_type="post"):
+        """
+        Lazily filter out invalid records, for pipelines that batch as they go.
 
-        if not comment["comment_id"]:
-            logger.warning("Comment has empty comment_id")
-            return False
+        Unlike filter_valid_records, nothing is counted or logged.
 
-        if not comment["post_id"]:
-            logger.warning("Comment has empty post_id")
-            return False
+        Args:
+            records (iterable): Records to validate
+            record_type (str): Type of record ("post" or "comment")
 
-        return True
+        Returns:
+            iterator: Valid records, in input order
+        """
+        return filter(self.validate_post if record_type == "post" else self.validate_comment, records)
 
     def filter_valid_records(self, records, record_type="post"):
         """
-        Filter out invalid records from the list.
+        Filter out invalid records.
 
         Args:
-            records (list): List of records to validate
+            records (iterable): Records to validate
             record_type (str): Type of record ("post" or "comment")
 
         Returns:
-            list: List of valid records
+            list: Valid records, in input order
         """
-        validate_func = self.validate_post if record_type == "post" else self.validate_comment
-
-        valid_records = []
-        invalid_count = 0
+        if not isinstance(records, list):
+            records = list(records)
 
-        for record in records:
-            if validate_func(record):
-                valid_records.append(record)
-            else:
-                invalid_count += 1
+        # Bound once, so the comprehension makes a plain local call per record
+        is_valid = self.validate_post if record_type == "post" else self.validate_comment
+        valid_records = [record for record in records if is_valid(record)]
 
+        invalid_count = len(records) - len(valid_records)
         if invalid_count > 0:
             logger.warning(f"Filtered out {invalid_count} invalid {record_type} records")
 
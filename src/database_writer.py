@@ -1,9 +1,119 @@
+import io
+import logging
+from operator import attrgetter
 import psycopg2
-from psycopg2.extras import execute_batch
+from psycopg2.extras import execute_values
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Default for database.copy_threshold: batches at least this large are bulk-loaded
+# with COPY into a staging table, smaller ones use a multi-row UPSERT. COPY is
+# already faster from a few hundred rows, so default batches of 1000 use it.
+COPY_THRESHOLD = 250
+
+POSTS_COLUMNS = ("post_id", "timestamp", "title", "post_texts", "text_length")
+COMMENTS_COLUMNS = ("comment_id", "post_id", "timestamp", "author", "comment_texts", "text_length")
+
+# Multi-row UPSERTs for batches below copy_threshold; execute_values expands
+# the VALUES %s placeholder into one (...) tuple per row
+UPSERT_QUERIES = {
+    "posts": """
+        INSERT INTO posts (post_id, timestamp, title, post_texts, text_length)
+        VALUES %s
+        ON CONFLICT (post_id)
+        DO UPDATE SET
+            timestamp = EXCLUDED.timestamp,
+            title = EXCLUDED.title,
+            post_texts = EXCLUDED.post_texts,
+            text_length = EXCLUDED.text_length;
+    """,
+    "comments": """
+        INSERT INTO comments (comment_id, post_id, timestamp, author, comment_texts, text_length)
+        VALUES %s
+        ON CONFLICT (comment_id)
+        DO UPDATE SET
+            post_id = EXCLUDED.post_id,
+            timestamp = EXCLUDED.timestamp,
+            author = EXCLUDED.author,
+            comment_texts = EXCLUDED.comment_texts,
+            text_length = EXCLUDED.text_length;
+    """
+}
+
+# Pull a record's fields out as a positional tuple in column order
+_post_row = attrgetter(*POSTS_COLUMNS)
+_comment_row = attrgetter(*COMMENTS_COLUMNS)
+
+# Escapes for the COPY text format
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+# Bytes handed to the server per COPY read
+COPY_BUFFER_SIZE = 1 << 20
+
+
+def _unique_rows(rows):
+    """
+    Keep the last row for each primary key (the first column).
+
+    A single INSERT ... ON CONFLICT cannot update the same row twice, so
+    duplicates within a batch are collapsed the way row-by-row UPSERTs
+    would have resolved them.
+    """
+    return list({row[0]: row for row in rows}.values())
+
+
+def _copy_value(value):
+    """Format a single value for the COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    return str(value)
+
+
+class _RowReader(io.RawIOBase):
+    """
+    Read-only file-like that formats rows for COPY as they are read.
+
+    Only the row being sent is held as text, instead of the whole batch.
+    """
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows (iterable): Row tuples in column order
+        """
+        self._rows = iter(rows)
+        self._pending = bytearray()
+
+    def readable(self):
+        """Report the reader as readable, as io.BufferedReader requires."""
+        return True
+
+    def readinto(self, buf):
+        """
+        Fill ``buf`` with COPY text, formatting further rows as needed.
+
+        Args:
+            buf (memoryview): Buffer to fill
+
+        Returns:
+            int: Bytes written, 0 once all rows have been read
+        """
+        # Top up the pending bytes with whole rows, then hand out what fits
+        while len(self._pending) < len(buf):
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._pending += "\t".join(map(_copy_value, row)).encode()
+            self._pending += b"\n"
+
+        size = min(len(buf), len(self._pending))
+        buf[:size] = self._pending[:size]
+        del self._pending[:size]
+        return size
+
 
 class DatabaseWriter:
     """
@@ -16,10 +126,14 @@ class DatabaseWriter:
 
         Args:
             db_config (dict): Database configuration containing host, database, username, password, port
+                and optionally copy_threshold
         """
         self.db_config = db_config
+        self.copy_threshold = db_config.get("copy_threshold") or COPY_THRESHOLD
         self.connection = None
         self.cursor = None
+        self._tables_verified = False
+        self._stage_tables = set()
         logger.info("DatabaseWriter initialized")
 
     def connect(self):
@@ -35,21 +149,58 @@ class DatabaseWriter:
                 database=self.db_config.get("database"),
                 user=self.db_config.get("username"),
                 password=self.db_config.get("password"),
-                port=self.db_config.get("port", 5432)
+                port=self.db_config.get("port", 5432),
+                # Let the kernel detect sockets dropped by idle timeouts or NAT
+                keepalives=1,
+                keepalives_idle=30,
+                keepalives_interval=10,
+                keepalives_count=3
             )
             self.cursor = self.connection.cursor()
+            self._stage_tables = set()
             logger.info(f"Connected to database: {self.db_config.get('database')}")
 
         except psycopg2.Error as e:
             logger.error(f"Failed to connect to database: {e}")
             raise
 
+    def ensure_connected(self):
+        """
+        Connect to the database unless a healthy connection is already held.
+
+        Lets a warm Lambda container reuse the connection from a previous invocation.
+        Any transaction a previous invocation left open, or aborted, is rolled back
+        first. The connection is then pinged with SELECT 1, inside a transaction that
+        is rolled back straight away, and replaced if the ping fails for any reason.
+
+        Raises:
+            psycopg2.Error: If connection fails
+        """
+        if self.connection is not None and not self.connection.closed:
+            try:
+                self.connection.rollback()
+                self.cursor.execute("SELECT 1")
+                self.connection.rollback()
+                return
+            except psycopg2.Error as e:
+                logger.warning(f"Stale database connection, reconnecting: {e}")
+                try:
+                    self.connection.close()
+                except psycopg2.Error:
+                    pass
+                self.connection = None
+                self.cursor = None
+
+        self.connect()
+
     def disconnect(self):
         """Close database connection."""
         if self.cursor:
             self.cursor.close()
         if self.connection:
             self.connection.close()
+        self.cursor = None
+        self.connection = None
         logger.info("Database connection closed")
 
     def insert_posts_batch(self, posts_batch):
@@ -57,7 +208,7 @@ class DatabaseWriter:
         Insert a batch of posts using UPSERT logic (INSERT ... ON CONFLICT DO UPDATE).
 
         Args:
-            posts_batch (list): List of post dictionaries
+            posts_batch (list): List of Post records
 
         Returns:
             tuple: (success_count, failure_count)
@@ -66,21 +217,17 @@ class DatabaseWriter:
             logger.warning("Empty posts batch provided")
             return 0, 0
 
-        upsert_query = """
-            INSERT INTO posts (post_id, timestamp, title, post_texts, text_length)
-            VALUES (%(post_id)s, %(timestamp)s, %(title)s, %(post_texts)s, %(text_length)s)
-            ON CONFLICT (post_id)
-            DO UPDATE SET
-                timestamp = EXCLUDED.timestamp,
-                title = EXCLUDED.title,
-                post_texts = EXCLUDED.post_texts,
-                text_length = EXCLUDED.text_length;
-        """
+        # Convert once to positional rows; both write paths consume tuples
+        rows = _unique_rows(map(_post_row, posts_batch))
 
         try:
-            execute_batch(self.cursor, upsert_query, posts_batch, page_size=len(posts_batch))
+            if len(rows) >= self.copy_threshold:
+                self._copy_upsert("posts", POSTS_COLUMNS, rows)
+            else:
+                execute_values(self.cursor, UPSERT_QUERIES["posts"], rows, page_size=len(rows))
             self.connection.commit()
-            logger.info(f"Successfully inserted/updated {len(posts_batch)} posts")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Successfully inserted/updated {len(posts_batch)} posts")
             return len(posts_batch), 0
 
         except psycopg2.Error as e:
@@ -93,7 +240,7 @@ class DatabaseWriter:
         Insert a batch of comments using UPSERT logic (INSERT ... ON CONFLICT DO UPDATE).
 
         Args:
-            comments_batch (list): List of comment dictionaries
+            comments_batch (list): List of Comment records
 
         Returns:
             tuple: (success_count, failure_count)
@@ -102,22 +249,17 @@ class DatabaseWriter:
             logger.warning("Empty comments batch provided")
             return 0, 0
 
-        upsert_query = """
-            INSERT INTO comments (comment_id, post_id, timestamp, author, comment_texts, text_length)
-            VALUES (%(comment_id)s, %(post_id)s, %(timestamp)s, %(author)s, %(comment_texts)s, %(text_length)s)
-            ON CONFLICT (comment_id)
-            DO UPDATE SET
-                post_id = EXCLUDED.post_id,
-                timestamp = EXCLUDED.timestamp,
-                author = EXCLUDED.author,
-                comment_texts = EXCLUDED.comment_texts,
-                text_length = EXCLUDED.text_length;
-        """
+        # Convert once to positional rows; both write paths consume tuples
+        rows = _unique_rows(map(_comment_row, comments_batch))
 
         try:
-            execute_batch(self.cursor, upsert_query, comments_batch, page_size=len(comments_batch))
+            if len(rows) >= self.copy_threshold:
+                self._copy_upsert("comments", COMMENTS_COLUMNS, rows)
+            else:
+                execute_values(self.cursor, UPSERT_QUERIES["comments"], rows, page_size=len(rows))
             self.connection.commit()
-            logger.info(f"Successfully inserted/updated {len(comments_batch)} comments")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Successfully inserted/updated {len(comments_batch)} comments")
             return len(comments_batch), 0
 
         except psycopg2.Error as e:
@@ -125,29 +267,85 @@ class DatabaseWriter:
             logger.error(f"Failed to insert comments batch: {e}")
             return 0, len(comments_batch)
 
+    def _ensure_stage_table(self, table):
+        """
+        Create the session's staging table for a table unless it already exists.
+
+        The table is created in its own committed transaction, so a later
+        rolled-back batch cannot drop it and batches skip the CREATE round-trip.
+
+        Args:
+            table (str): Target table name ("posts" or "comments")
+        """
+        if table in self._stage_tables:
+            return
+
+        self.cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {table}_stage "
+            f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        self.connection.commit()
+        self._stage_tables.add(table)
+
+    def _copy_upsert(self, table, columns, rows):
+        """
+        Bulk-load records with COPY into a temporary staging table, then
+        UPSERT them into the target table with a single INSERT ... SELECT.
+
+        The staging table is emptied on every commit. The caller is
+        responsible for committing or rolling back.
+
+        Args:
+            table (str): Target table name ("posts" or "comments")
+            columns (tuple): Column names, primary key first
+            rows (iterable): Row tuples in column order, unique by primary key
+        """
+        stage_table = f"{table}_stage"
+        key_column = columns[0]
+        column_list = ", ".join(columns)
+
+        self._ensure_stage_table(table)
+        self.cursor.copy_expert(
+            f"COPY {stage_table} ({column_list}) FROM STDIN WITH (FORMAT text)",
+            io.BufferedReader(_RowReader(rows), buffer_size=COPY_BUFFER_SIZE),
+            size=COPY_BUFFER_SIZE
+        )
+
+        update_list = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns[1:])
+        self.cursor.execute(f"""
+            INSERT INTO {table} ({column_list})
+            SELECT {column_list} FROM {stage_table}
+            ON CONFLICT ({key_column})
+            DO UPDATE SET {update_list};
+        """)
+
     def process_batches(self, batches, batch_type="posts"):
         """
         Process multiple batches and track success/failure statistics.
 
         Args:
-            batches (list): List of batches to process
+            batches (iterable): Batches to process (a list or a generator)
             batch_type (str): Type of data ("posts" or "comments")
 
         Returns:
             dict: Statistics about the processing (total, success, failed)
         """
-        total_records = sum(len(batch) for batch in batches)
+        total_records = 0
+        total_batches = 0
         total_success = 0
         total_failed = 0
 
         insert_func = self.insert_posts_batch if batch_type == "posts" else self.insert_comments_batch
 
-        logger.info(f"Processing {len(batches)} batches of {batch_type} ({total_records} total records)")
+        logger.info(f"Processing {batch_type} batches")
 
         for i, batch in enumerate(batches, 1):
-            logger.info(f"Processing {batch_type} batch {i}/{len(batches)} ({len(batch)} records)")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Processing {batch_type} batch {i} ({len(batch)} records)")
 
             success, failed = insert_func(batch)
+            total_records += len(batch)
+            total_batches += 1
             total_success += success
             total_failed += failed
 
@@ -156,7 +354,7 @@ class DatabaseWriter:
 
         stats = {
             "total_records": total_records,
-            "total_batches": len(batches),
+            "total_batches": total_batches,
             "success": total_success,
             "failed": total_failed
         }
@@ -168,33 +366,32 @@ class DatabaseWriter:
         """
         Verify that required tables (posts and comments) exist in the database.
 
+        The schema does not change while a container is alive, so a successful
+        check is remembered and later calls return without a round-trip.
+
         Returns:
             bool: True if tables exist, False otherwise
         """
-        try:
-            self.cursor.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables
-                    WHERE table_name = 'posts'
-                );
-            """)
-            posts_exists = self.cursor.fetchone()[0]
+        if self._tables_verified:
+            return True
 
+        try:
             self.cursor.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables
-                    WHERE table_name = 'comments'
-                );
+                SELECT count(DISTINCT table_name)
+                FROM information_schema.tables
+                WHERE table_name IN ('posts', 'comments');
             """)
-            comments_exists = self.cursor.fetchone()[0]
+            tables_found = self.cursor.fetchone()[0]
 
-            if posts_exists and comments_exists:
+            if tables_found == 2:
                 logger.info("Verified: posts and comments tables exist")
+                self._tables_verified = True
                 return True
             else:
                 logger.error("Required tables do not exist in database")
                 return False
 
         except psycopg2.Error as e:
+            self.connection.rollback()
             logger.error(f"Failed to verify tables: {e}")
             return False
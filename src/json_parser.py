@@ -1,19 +1,70 @@
-import json
+import logging
+import mmap
 from datetime import datetime
+import ijson
+import msgspec
 from src.logger import get_logger
+from src.records import Comment, ExportComment, ExportPost, FacebookExport, Post
+
+try:
+    from ciso8601 import parse_datetime_as_naive
+except ImportError:
+    def parse_datetime_as_naive(timestamp_str):
+        """Fallback for when the ciso8601 C extension is not installed."""
+        return datetime.fromisoformat(timestamp_str).replace(tzinfo=None)
 
 logger = get_logger(__name__)
 
+# Bytes read from a stream per parser refill (ijson's own default)
+DEFAULT_STREAM_BUFFER_SIZE = 64 * 1024
+
+# ijson prefixes of the array items we extract, mapped to their record type,
+# in the order they are streamed: posts first, as comments reference them
+RECORD_PREFIXES = {
+    "posts.item": "post",
+    "comments.item": "comment",
+}
+
+# Content of these types is already in memory (or mapped) and decoded in one go
+IN_MEMORY_TYPES = (str, bytes, bytearray, memoryview, mmap.mmap)
+
+# Schema of each record type in the export
+RECORD_SCHEMAS = {
+    "post": ExportPost,
+    "comment": ExportComment,
+}
+
+# Decoders are reusable and validate against the schema while decoding
+_EXPORT_DECODER = msgspec.json.Decoder(FacebookExport)
+_RECORD_DECODERS = {
+    record_type: msgspec.json.Decoder(schema) for record_type, schema in RECORD_SCHEMAS.items()
+}
+
+
+def _as_text(value):
+    """Return a scalar field as text, leaving strings and None as they are."""
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
 
 class FacebookJSONParser:
     """
     Parses Facebook JSON export format and extracts posts and comments.
     """
 
-    def __init__(self):
-        """Initialize the parser."""
+    def __init__(self, strict_validate=True):
+        """
+        Initialize the parser.
+
+        Args:
+            strict_validate (bool): Drop records missing their ids while parsing,
+                so callers need not validate them again (default: True)
+        """
+        self.strict_validate = strict_validate
         self.posts = []
         self.comments = []
+        self.invalid_timestamps = 0
         logger.info("FacebookJSONParser initialized")
 
     def parse(self, json_content):
@@ -21,100 +72,222 @@ class FacebookJSONParser:
         Parse Facebook JSON content and extract posts and comments.
 
         Args:
-            json_content (str): JSON content as string
+            json_content (str, bytes-like, file-like or callable): JSON content, e.g.
+                bytes or an mmap of a file, a binary file, or a callable that opens
+                a fresh binary stream such as the S3 ``StreamingBody``
 
         Returns:
             tuple: (posts_list, comments_list)
 
         Raises:
-            json.JSONDecodeError: If JSON is malformed
-            KeyError: If expected keys are missing
+            msgspec.DecodeError: If in-memory JSON content is malformed
+            ijson.JSONError: If streamed JSON content is malformed
         """
-        try:
-            data = json.loads(json_content)
-            logger.info("JSON content parsed successfully")
+        self.posts = []
+        self.comments = []
 
-            self.posts = self._extract_posts(data.get("posts", []))
-            self.comments = self._extract_comments(data.get("comments", []))
+        try:
+            for record_type, record in self.iter_records(json_content):
+                if record_type == "post":
+                    self.posts.append(record)
+                else:
+                    self.comments.append(record)
 
             logger.info(f"Extracted {len(self.posts)} posts and {len(self.comments)} comments")
 
             return self.posts, self.comments
 
-        except json.JSONDecodeError as e:
+        except (msgspec.DecodeError, ijson.JSONError) as e:
             logger.error(f"Failed to parse JSON: {e}")
             raise
         except Exception as e:
             logger.error(f"Unexpected error during parsing: {e}")
             raise
 
-    def _extract_posts(self, posts_data):
+    def iter_records(self, json_content, buffer_size=DEFAULT_STREAM_BUFFER_SIZE):
         """
-        Extract and transform posts from JSON data.
+        Iterate over the posts and comments in the JSON content.
+
+        Every post is yielded before any comment, whatever the order of the
+        "posts" and "comments" keys in the document, so comments never
+        reference posts that have not been written yet.
+
+        Content already in memory is decoded with msgspec, which checks each
+        record against its schema while decoding. Streams are read with ijson,
+        holding only one raw record in memory at a time, in one pass per
+        record type: a callable is called for a fresh stream per pass, a
+        seekable file is rewound, and any other stream is read into memory.
+        Streamed records are checked against the same schema. Skipped records
+        are logged once, as a summary, after the content is exhausted.
 
         Args:
-            posts_data (list): List of post objects from JSON
+            json_content (str, bytes-like, file-like or callable): JSON content,
+                binary stream, or callable returning a new binary stream
+            buffer_size (int): Bytes to read from a stream at a time
 
-        Returns:
-            list: List of transformed post dictionaries
+        Yields:
+            tuple: (record_type, record) where record_type is "post" or "comment"
         """
-        extracted_posts = []
+        if isinstance(json_content, IN_MEMORY_TYPES):
+            records = self._iter_document(json_content)
+        elif callable(json_content):
+            records = self._iter_stream(json_content, buffer_size, close=True)
+        elif json_content.seekable():
+            start = json_content.tell()
+
+            def rewind():
+                json_content.seek(start)
+                return json_content
+
+            records = self._iter_stream(rewind, buffer_size, close=False)
+        else:
+            records = self._iter_document(json_content.read())
+
+        self.invalid_timestamps = 0
+        skipped = {"post": 0, "comment": 0}
+
+        for record_type, record in records:
+            if record is None:
+                skipped[record_type] += 1
+                continue
+            yield record_type, record
+
+        if skipped["post"] or skipped["comment"]:
+            logger.warning(
+                f"Skipped {skipped['post']} posts and {skipped['comment']} comments "
+                f"with missing ids or malformed fields"
+            )
+        if self.invalid_timestamps:
+            logger.warning(f"Stored {self.invalid_timestamps} unparseable timestamps as NULL")
 
-        for post in posts_data:
+    def _iter_document(self, content):
+        """
+        Iterate over the posts and comments of JSON content held in memory.
+
+        Args:
+            content (str or bytes): JSON content
+
+        Yields:
+            tuple: (record_type, record), with record None for skipped records
+        """
+        export = _EXPORT_DECODER.decode(content)
+
+        for record_type, raw_records in (("post", export.posts), ("comment", export.comments)):
+            decoder = _RECORD_DECODERS[record_type]
+            for raw in raw_records:
+                try:
+                    record = decoder.decode(raw)
+                except msgspec.ValidationError as e:
+                    yield record_type, self._reject(record_type, e)
+                    continue
+                yield record_type, self._extract(record_type, record)
+
+    def _iter_stream(self, open_stream, buffer_size, close):
+        """
+        Stream posts, then comments, out of a binary stream, one pass each.
+
+        Args:
+            open_stream (callable): Returns the stream to read, positioned at
+                the start of the document; called once per pass
+            buffer_size (int): Bytes to read from the stream at a time
+            close (bool): Close each stream once its pass is done
+
+        Yields:
+            tuple: (record_type, record), with record None for skipped records
+        """
+        for record_prefix, record_type in RECORD_PREFIXES.items():
+            schema = RECORD_SCHEMAS[record_type]
+            stream = open_stream()
             try:
-                # Extract post text from data array
-                post_text = ""
-                if post.get("data") and len(post["data"]) > 0:
-                    post_text = post["data"][0].get("post", "")
-
-                post_dict = {
-                    "post_id": post.get("id", ""),
-                    "timestamp": self._parse_timestamp(post.get("timestamp", "")),
-                    "title": post.get("title", ""),
-                    "post_texts": post_text,
-                    "text_length": len(post_text)
-                }
-
-                extracted_posts.append(post_dict)
-
-            except Exception as e:
-                logger.warning(f"Failed to extract post {post.get('id', 'unknown')}: {e}")
-                continue
+                # ijson's C backend builds each raw record; only records reach Python
+                for raw in ijson.items(stream, record_prefix, buf_size=buffer_size, use_float=True):
+                    try:
+                        record = msgspec.convert(raw, schema)
+                    except msgspec.ValidationError as e:
+                        yield record_type, self._reject(record_type, e)
+                        continue
+                    yield record_type, self._extract(record_type, record)
+            finally:
+                if close:
+                    stream.close()
+
+    def _extract(self, record_type, record):
+        """
+        Extract a validated export record into a Post or Comment.
 
-        return extracted_posts
+        Args:
+            record_type (str): "post" or "comment"
+            record (ExportPost or ExportComment): Validated export record
 
-    def _extract_comments(self, comments_data):
+        Returns:
+            Post, Comment or None: Extracted record, or None if it is missing ids
+        """
+        if record_type == "post":
+            return self._extract_post(record)
+        return self._extract_comment(record)
+
+    def _reject(self, record_type, error):
         """
-        Extract and transform comments from JSON data.
+        Note a record that failed schema validation.
 
         Args:
-            comments_data (list): List of comment objects from JSON
+            record_type (str): "post" or "comment"
+            error (msgspec.ValidationError): Validation error
 
         Returns:
-            list: List of transformed comment dictionaries
+            None: Placeholder for the skipped record
         """
-        extracted_comments = []
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Skipping invalid {record_type}: {error}")
+        return None
 
-        for comment in comments_data:
-            try:
-                comment_text = comment.get("comment", "")
+    def _extract_post(self, post):
+        """
+        Extract a single post from its export record.
+
+        Args:
+            post (ExportPost): Validated post from JSON
 
-                comment_dict = {
-                    "comment_id": comment.get("id", ""),
-                    "post_id": comment.get("post_id", ""),
-                    "timestamp": self._parse_timestamp(comment.get("timestamp", "")),
-                    "author": comment.get("author", ""),
-                    "comment_texts": comment_text,
-                    "text_length": len(comment_text)
-                }
+        Returns:
+            Post or None: Extracted post, or None if it has no id and
+                strict_validate is set
+        """
+        if self.strict_validate and not post.id:
+            return None
 
-                extracted_comments.append(comment_dict)
+        # Extract post text from data array
+        post_text = post.data[0].post if post.data else ""
 
-            except Exception as e:
-                logger.warning(f"Failed to extract comment {comment.get('id', 'unknown')}: {e}")
-                continue
+        return Post(
+            post_id=_as_text(post.id),
+            timestamp=self._parse_timestamp(post.timestamp),
+            title=_as_text(post.title),
+            post_texts=post_text,
+            text_length=len(post_text)
+        )
+
+    def _extract_comment(self, comment):
+        """
+        Extract a single comment from its export record.
+
+        Args:
+            comment (ExportComment): Validated comment from JSON
+
+        Returns:
+            Comment or None: Extracted comment, or None if it has no id or post_id
+                and strict_validate is set
+        """
+        if self.strict_validate and (not comment.id or not comment.post_id):
+            return None
 
-        return extracted_comments
+        return Comment(
+            comment_id=_as_text(comment.id),
+            post_id=_as_text(comment.post_id),
+            timestamp=self._parse_timestamp(comment.timestamp),
+            author=_as_text(comment.author),
+            comment_texts=comment.comment,
+            text_length=len(comment.comment)
+        )
 
     def _parse_timestamp(self, timestamp_str):
         """
@@ -130,19 +303,14 @@ class FacebookJSONParser:
             return None
 
         try:
-            # Handle ISO 8601 format with timezone
-            # Example: "2024-11-18T09:42:13+0000"
-            if '+' in timestamp_str or timestamp_str.endswith('Z'):
-                # Remove timezone for simplicity (store as UTC)
-                timestamp_str = timestamp_str.replace('Z', '+0000')
-                dt = datetime.strptime(timestamp_str[:19], "%Y-%m-%dT%H:%M:%S")
-                return dt
-            else:
-                dt = datetime.strptime(timestamp_str, "%Y-%m-%dT%H:%M:%S")
-                return dt
+            # ISO 8601, e.g. "2024-11-18T09:42:13+0000"; the UTC offset is
+            # dropped and the wall-clock time is stored as-is
+            return parse_datetime_as_naive(timestamp_str)
 
         except ValueError as e:
-            logger.warning(f"Failed to parse timestamp '{timestamp_str}': {e}")
+            self.invalid_timestamps += 1
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Failed to parse timestamp '{timestamp_str}': {e}")
             return None
 
     def get_posts(self):
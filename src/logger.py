@@ -1,11 +1,87 @@
+import atexit
 import logging
+import logging.handlers
+import os
 import sys
 
+# Defaults to WARNING so per-phase INFO logs stay out of CloudWatch unless asked for.
+# An unknown level name also falls back to WARNING rather than failing at import.
+LOG_LEVEL = logging.getLevelName(os.getenv("LOG_LEVEL", "WARNING").upper())
+if not isinstance(LOG_LEVEL, int):
+    LOG_LEVEL = logging.WARNING
+
+# Records held in memory before they are written out in one go (outside Lambda)
+LOG_BUFFER_CAPACITY = 1024
+
+# Inside Lambda records are written straight through: a timeout or a killed
+# sandbox would otherwise lose the buffered logs of exactly the failing invocation
+BUFFER_LOGS = "AWS_LAMBDA_FUNCTION_NAME" not in os.environ
+
+# One handler shared by every logger, so lines from different modules stay in order
+_HANDLER = None
+
+
+def _get_handler():
+    """
+    Return the shared handler, creating it on first use.
+
+    Inside Lambda records go straight to stdout. Elsewhere (e.g. test_local)
+    they are buffered and written out once LOG_BUFFER_CAPACITY of them have
+    piled up, or straight away for WARNING and above.
+
+    Returns:
+        logging.Handler: Shared handler
+    """
+    global _HANDLER
+
+    if _HANDLER is None:
+        target = logging.StreamHandler(sys.stdout)
+
+        formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+        target.setFormatter(formatter)
+
+        if not BUFFER_LOGS:
+            _HANDLER = target
+        else:
+            _HANDLER = logging.handlers.MemoryHandler(
+                capacity=LOG_BUFFER_CAPACITY,
+                flushLevel=logging.WARNING,
+                target=target
+            )
+            atexit.register(flush_logs)
+
+    return _HANDLER
+
+
+def flush_logs():
+    """Write out all buffered log records (a no-op when logs are not buffered)."""
+    if _HANDLER is not None:
+        _HANDLER.flush()
+
+
+def set_level(level):
+    """
+    Change the level of every logger created by get_logger.
+
+    Args:
+        level (int or str): New logging level, e.g. logging.ERROR or "ERROR"
+    """
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger) and _HANDLER in logger.handlers:
+            logger.setLevel(level)
+
 
 def get_logger(name):
     """
     Create and configure a logger instance for the given module name.
 
+    The level is taken from the LOG_LEVEL environment variable (default, and
+    fallback for unknown names, WARNING).
+    Output is buffered; call flush_logs() to write it out early.
+
     Args:
         name (str): Name of the logger (typically __name__ from calling module)
 
@@ -15,17 +91,7 @@ def get_logger(name):
     logger = logging.getLogger(name)
 
     if not logger.handlers:
-        logger.setLevel(logging.INFO)
-
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(logging.INFO)
-
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        handler.setFormatter(formatter)
-
-        logger.addHandler(handler)
+        logger.setLevel(LOG_LEVEL)
+        logger.addHandler(_get_handler())
 
     return logger
@@ -0,0 +1,79 @@
+from datetime import datetime
+import msgspec
+
+
+class Post(msgspec.Struct, gc=False):
+    """
+    A post extracted from the Facebook export, in posts table column order.
+
+    Records only hold scalars and cannot form reference cycles, so they are
+    left out of garbage collector tracking.
+    """
+
+    post_id: str
+    timestamp: datetime | None
+    title: str | None
+    post_texts: str
+    text_length: int
+
+
+class Comment(msgspec.Struct, gc=False):
+    """
+    A comment extracted from the Facebook export, in comments table column order.
+
+    Untracked by the garbage collector, like Post.
+    """
+
+    comment_id: str
+    post_id: str
+    timestamp: datetime | None
+    author: str | None
+    comment_texts: str
+    text_length: int
+
+
+class ExportPostData(msgspec.Struct):
+    """
+    An entry of a post's "data" array in the Facebook export.
+    """
+
+    post: str = ""
+
+
+class ExportPost(msgspec.Struct):
+    """
+    Schema of a raw post in the Facebook export. Unknown fields such as
+    attachments are ignored.
+
+    Numeric ids and titles are accepted and stored as text, and a null
+    "data" array means the post has no text.
+    """
+
+    id: str | int = ""
+    timestamp: str | None = ""
+    title: str | int | float | None = ""
+    data: list[ExportPostData] | None = None
+
+
+class ExportComment(msgspec.Struct):
+    """
+    Schema of a raw comment in the Facebook export.
+
+    Numeric ids and authors are accepted and stored as text, as for posts.
+    """
+
+    id: str | int = ""
+    post_id: str | int = ""
+    timestamp: str | None = ""
+    author: str | int | float | None = ""
+    comment: str = ""
+
+
+class FacebookExport(msgspec.Struct):
+    """
+    Top level of the Facebook export. Records are kept as raw JSON so each
+    one can be validated, and rejected, on its own.
+    """
+
+    posts: list[msgspec.Raw] = []
+    comments: list[msgspec.Raw] = []
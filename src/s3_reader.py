@@ -1,26 +1,60 @@
-import boto3
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+import botocore.session
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Upper bound on concurrent S3 reads; past this, thread switching dominates
+MAX_WORKERS = 30
+
+# Size of each read from an S3 body; large reads avoid many small socket reads
+DEFAULT_READ_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def create_s3_client():
+    """
+    Create an S3 client whose connection pool can serve MAX_WORKERS concurrent reads.
+
+    The client comes straight from a botocore session, skipping boto3's
+    session and resource layer, and keeps its TCP connections alive.
+
+    Returns:
+        botocore.client.S3: Configured S3 client
+    """
+    return botocore.session.get_session().create_client(
+        's3',
+        config=Config(
+            max_pool_connections=MAX_WORKERS,
+            retries={'max_attempts': 3},
+            s3={'addressing_style': 'virtual'},
+            tcp_keepalive=True
+        )
+    )
+
 
 class S3Reader:
     """
     Handles reading JSON files from AWS S3.
     """
 
-    def __init__(self, s3_config):
+    def __init__(self, s3_config, s3_client=None):
         """
         Initialize S3Reader with configuration.
 
         Args:
             s3_config (dict): S3 configuration containing bucket_name, folder_path, file_name
+                and optionally read_buffer_size
+            s3_client (botocore.client.S3): Existing S3 client to reuse. If None, a new one is created.
         """
         self.bucket_name = s3_config.get("bucket_name")
         self.folder_path = s3_config.get("folder_path", "")
         self.file_name = s3_config.get("file_name")
-        self.s3_client = boto3.client('s3')
+        self.read_buffer_size = s3_config.get("read_buffer_size") or DEFAULT_READ_BUFFER_SIZE
+        self.s3_client = s3_client or create_s3_client()
 
         logger.info(f"S3Reader initialized for bucket: {self.bucket_name}")
 
@@ -37,10 +71,15 @@ class S3Reader:
 
     def read_json_file(self):
         """
-        Read JSON file from S3 and return its content as a string.
+        Download the JSON file from S3 into a temporary file and return it.
+
+        The body is copied in reads of ``read_buffer_size`` bytes, so it is
+        never held in memory whole, and fetched with a single GET. The file
+        is rewound between the parser's passes rather than opening the
+        object again; it is deleted once closed.
 
         Returns:
-            str: JSON file content as string
+            file: Temporary binary file holding the JSON content, positioned at the start
 
         Raises:
             ClientError: If S3 operation fails
@@ -56,12 +95,19 @@ class S3Reader:
                 Key=s3_key
             )
 
-            json_content = response['Body'].read().decode('utf-8')
+            file_size_mb = response.get('ContentLength', 0) / (1024 * 1024)
+            logger.info(f"Downloading {file_size_mb:.2f} MB from S3 to a temporary file")
 
-            file_size_mb = len(json_content) / (1024 * 1024)
-            logger.info(f"Successfully read {file_size_mb:.2f} MB from S3")
+            json_file = tempfile.TemporaryFile()
+            try:
+                for chunk in response['Body'].iter_chunks(chunk_size=self.read_buffer_size):
+                    json_file.write(chunk)
+                json_file.seek(0)
+            except BaseException:
+                json_file.close()
+                raise
 
-            return json_content
+            return json_file
 
         except ClientError as e:
             error_code = e.response['Error']['Code']
@@ -77,6 +123,85 @@ class S3Reader:
             logger.error(f"Unexpected error reading from S3: {str(e)}")
             raise
 
+    def read_json_files(self, keys):
+        """
+        Read several JSON files from S3 concurrently.
+
+        Files are fetched on a thread pool of up to MAX_WORKERS threads and
+        yielded in completion order, not in the order of ``keys``. At most
+        MAX_WORKERS reads are in flight at a time; the next key is submitted
+        as each file is yielded, so only that many files are held in memory.
+        Reads not yet started are cancelled if a read fails or the caller
+        stops early.
+
+        Args:
+            keys (list): Full S3 object keys to read
+
+        Yields:
+            tuple: (s3_key, content) with the file content as bytes
+
+        Raises:
+            ClientError: If an S3 operation fails
+        """
+        if not keys:
+            return
+
+        remaining = iter(keys)
+
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(keys))) as executor:
+            pending = {
+                executor.submit(self._read_object, key): key
+                for key in islice(remaining, MAX_WORKERS)
+            }
+
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+                    while done:
+                        # Drop finished futures as they are taken so each
+                        # content can be freed once yielded
+                        future = done.pop()
+                        s3_key = pending.pop(future)
+
+                        next_key = next(remaining, None)
+                        if next_key is not None:
+                            pending[executor.submit(self._read_object, next_key)] = next_key
+
+                        try:
+                            content = future.result()
+                        except ClientError as e:
+                            logger.error(f"Failed to read s3://{self.bucket_name}/{s3_key}: {e.response['Error']['Code']}")
+                            raise
+                        del future
+                        yield s3_key, content
+                        del content
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        logger.info(f"Successfully read {len(keys)} files from S3")
+
+    def _read_object(self, s3_key):
+        """
+        Read a whole S3 object into memory.
+
+        Args:
+            s3_key (str): Full S3 object key
+
+        Returns:
+            bytes: Object content
+        """
+        response = self.s3_client.get_object(
+            Bucket=self.bucket_name,
+            Key=s3_key
+        )
+
+        content = bytearray()
+        for chunk in response['Body'].iter_chunks(chunk_size=self.read_buffer_size):
+            content.extend(chunk)
+        return bytes(content)
+
     def file_exists(self):
         """
         Check if the file exists in S3.
@@ -1,99 +1,245 @@
 """
 Local testing script for Facebook JSON parser and transformer.
 
-This script tests the JSON parsing and data transformation logic
-without requiring S3 or database connections.
+This script tests the JSON parsing and data transformation logic, and the
+COPY serialization used for bulk loads, without requiring S3 or database
+connections.
 """
 
-import json
+import argparse
+import io
+import logging
+import mmap
+import os
+from datetime import datetime
+
+# Show the parsed records unless LOG_LEVEL is set explicitly
+os.environ.setdefault("LOG_LEVEL", "INFO")
+
 from src.json_parser import FacebookJSONParser
 from src.data_transformer import DataTransformer
-from src.logger import get_logger
+from src.logger import get_logger, set_level
 
 logger = get_logger(__name__)
 
+# Section separators
+_SEP = "=" * 80
+_NL_SEP = "\n" + _SEP
+
+# Longest text preview shown; longer texts get an ellipsis
+_PREVIEW_LENGTH = 50
+
+# Display templates for one parsed record
+_POST_DISPLAY = "\nPost %d:\n  ID: %s\n  Title: %s\n  Timestamp: %s\n  Text: %.*s%s\n  Text Length: %d"
+_COMMENT_DISPLAY = (
+    "\nComment %d:\n  ID: %s\n  Post ID: %s\n  Author: %s\n  Timestamp: %s\n"
+    "  Text: %.*s%s\n  Text Length: %d"
+)
+
 
-def test_json_parsing():
-    """Test JSON parsing with the example facebook_file.json."""
-    logger.info("=" * 80)
+def test_json_parsing(strict_validate=True):
+    """
+    Test JSON parsing with the example facebook_file.json.
+
+    With strict_validate the parser drops invalid records itself, so the
+    DataTransformer validators are not needed afterwards.
+    """
+    logger.info(_SEP)
     logger.info("Testing JSON Parsing")
-    logger.info("=" * 80)
+    logger.info(_SEP)
 
     try:
-        # Read the example JSON file
-        with open('facebook_file.json', 'r') as f:
-            json_content = f.read()
+        # Map the example JSON file instead of copying it into a bytes object;
+        # the parser decodes UTF-8 itself
+        with open('facebook_file.json', 'rb') as f:
+            # Start readahead of the whole file before the pages are touched
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
 
-        logger.info(f"Loaded JSON file ({len(json_content)} bytes)")
+            logger.info(f"Loaded JSON file ({len(mm)} bytes)")
 
-        # Parse the JSON
-        parser = FacebookJSONParser()
-        posts, comments = parser.parse(json_content)
+            # Parse the JSON
+            parser = FacebookJSONParser(strict_validate=strict_validate)
+            posts, comments = parser.parse(mm)
+        finally:
+            mm.close()
 
         logger.info(f"Parsed {len(posts)} posts and {len(comments)} comments")
 
+        # Parse again the way the Lambda does, streaming one pass per record
+        # type from a freshly opened file; both paths must agree
+        streamed = FacebookJSONParser(strict_validate=strict_validate).parse(
+            lambda: open('facebook_file.json', 'rb')
+        )
+        if streamed != (posts, comments):
+            raise AssertionError("Streamed parse differs from in-memory parse")
+
+        logger.info("Streamed parse matches in-memory parse")
+
         # Display parsed data
-        logger.info("\n" + "=" * 80)
+        logger.info(_NL_SEP)
         logger.info("POSTS:")
-        logger.info("=" * 80)
-        for i, post in enumerate(posts, 1):
-            logger.info(f"\nPost {i}:")
-            logger.info(f"  ID: {post['post_id']}")
-            logger.info(f"  Title: {post['title']}")
-            logger.info(f"  Timestamp: {post['timestamp']}")
-            logger.info(f"  Text: {post['post_texts'][:50]}..." if len(post['post_texts']) > 50 else f"  Text: {post['post_texts']}")
-            logger.info(f"  Text Length: {post['text_length']}")
-
-        logger.info("\n" + "=" * 80)
+        logger.info(_SEP)
+        # One log call per section, skipped entirely when INFO is off
+        if posts and logger.isEnabledFor(logging.INFO):
+            logger.info("\n".join([
+                _POST_DISPLAY % (
+                    i, post.post_id, post.title, post.timestamp,
+                    _PREVIEW_LENGTH, post.post_texts, "..." * (len(post.post_texts) > _PREVIEW_LENGTH),
+                    post.text_length
+                )
+                for i, post in enumerate(posts, 1)
+            ]))
+
+        logger.info(_NL_SEP)
         logger.info("COMMENTS:")
-        logger.info("=" * 80)
-        for i, comment in enumerate(comments, 1):
-            logger.info(f"\nComment {i}:")
-            logger.info(f"  ID: {comment['comment_id']}")
-            logger.info(f"  Post ID: {comment['post_id']}")
-            logger.info(f"  Author: {comment['author']}")
-            logger.info(f"  Timestamp: {comment['timestamp']}")
-            logger.info(f"  Text: {comment['comment_texts'][:50]}..." if len(comment['comment_texts']) > 50 else f"  Text: {comment['comment_texts']}")
-            logger.info(f"  Text Length: {comment['text_length']}")
-
-        return posts, comments
+        logger.info(_SEP)
+        if comments and logger.isEnabledFor(logging.INFO):
+            logger.info("\n".join([
+                _COMMENT_DISPLAY % (
+                    i, comment.comment_id, comment.post_id, comment.author, comment.timestamp,
+                    _PREVIEW_LENGTH, comment.comment_texts,
+                    "..." * (len(comment.comment_texts) > _PREVIEW_LENGTH),
+                    comment.text_length
+                )
+                for i, comment in enumerate(comments, 1)
+            ]))
+
+        return posts, comments, parser
 
     except Exception as e:
         logger.error(f"Test failed: {e}")
         raise
 
 
-def test_data_transformation(posts, comments):
-    """Test data transformation and batching."""
-    logger.info("\n" + "=" * 80)
+def _batch_sizes(transformer, records, record_type, validate):
+    """
+    Validate (if asked) and batch records in one lazy pass.
+
+    Only one batch is held at a time; just its size is kept.
+    """
+    if not validate:
+        valid_records = records
+    else:
+        valid_records = transformer.iter_valid(records, record_type=record_type)
+    return [len(batch) for batch in transformer.create_batches(valid_records)]
+
+
+def test_data_transformation(posts, comments, parser):
+    """
+    Test data transformation and batching.
+
+    Records are run through the DataTransformer validators unless the parser
+    already validated them (strict_validate).
+    """
+    logger.info(_NL_SEP)
     logger.info("Testing Data Transformation")
-    logger.info("=" * 80)
+    logger.info(_SEP)
 
     try:
         transformer = DataTransformer(batch_size=1000)
+        validate = not parser.strict_validate
 
-        # Validate records
-        valid_posts = transformer.filter_valid_records(posts, record_type="post")
-        valid_comments = transformer.filter_valid_records(comments, record_type="comment")
-
-        logger.info(f"Valid posts: {len(valid_posts)}/{len(posts)}")
-        logger.info(f"Valid comments: {len(valid_comments)}/{len(comments)}")
+        # Validate and batch records
+        posts_batch_sizes = _batch_sizes(transformer, posts, "post", validate)
+        comments_batch_sizes = _batch_sizes(transformer, comments, "comment", validate)
 
-        # Create batches
-        posts_batches = transformer.create_batches(valid_posts)
-        comments_batches = transformer.create_batches(valid_comments)
+        if validate:
+            logger.info(f"Valid posts: {sum(posts_batch_sizes)}/{len(posts)}")
+            logger.info(f"Valid comments: {sum(comments_batch_sizes)}/{len(comments)}")
+        else:
+            logger.info("Validation skipped: the strict parser already dropped invalid records")
 
-        logger.info(f"Posts batches created: {len(posts_batches)}")
-        logger.info(f"Comments batches created: {len(comments_batches)}")
+        logger.info(f"Posts batches created: {len(posts_batch_sizes)}")
+        logger.info(f"Comments batches created: {len(comments_batch_sizes)}")
 
         # Show batch details
-        for i, batch in enumerate(posts_batches, 1):
-            logger.info(f"  Posts Batch {i}: {len(batch)} records")
+        for i, size in enumerate(posts_batch_sizes, 1):
+            logger.info(f"  Posts Batch {i}: {size} records")
+
+        for i, size in enumerate(comments_batch_sizes, 1):
+            logger.info(f"  Comments Batch {i}: {size} records")
+
+        return len(posts_batch_sizes), len(comments_batch_sizes)
 
-        for i, batch in enumerate(comments_batches, 1):
-            logger.info(f"  Comments Batch {i}: {len(batch)} records")
+    except Exception as e:
+        logger.error(f"Test failed: {e}")
+        raise
+
+
+def test_copy_serialization():
+    """
+    Test the COPY text format escaping used for bulk loads, and that the
+    streaming _RowReader produces the same bytes as formatting the whole
+    batch into a StringIO.
+
+    Returns:
+        bool: True if the test ran, False if psycopg2 is not installed
+    """
+    logger.info(_NL_SEP)
+    logger.info("Testing COPY Serialization")
+    logger.info(_SEP)
+
+    try:
+        from src.database_writer import COPY_BUFFER_SIZE, _copy_value, _RowReader
+    except ImportError as e:
+        logger.warning(f"Skipping COPY serialization test: {e}")
+        return False
+
+    try:
+        cases = [
+            (None, "\\N"),
+            ("plain", "plain"),
+            ("a\tb", "a\\tb"),
+            ("a\nb\r", "a\\nb\\r"),
+            ("back\\slash", "back\\\\slash"),
+            ("\\N", "\\\\N"),
+            ("héllo 日本", "héllo 日本"),
+            (42, "42"),
+            (datetime(2024, 11, 18, 9, 42, 13), "2024-11-18 09:42:13"),
+        ]
+        for value, expected in cases:
+            actual = _copy_value(value)
+            if actual != expected:
+                raise AssertionError(f"_copy_value({value!r}) returned {actual!r}, expected {expected!r}")
+
+        logger.info(f"COPY escaping correct for {len(cases)} values")
+
+        # Multibyte characters land on every offset of small reads, and the
+        # last text is longer than the 1 MiB buffer, so reads split rows and characters
+        rows = [
+            (f"id{i}", "日本\t語" * (i % 7), None, "é\\\n" * i, i, datetime(2024, 1, 1, 0, 0, i % 60))
+            for i in range(300)
+        ]
+        big_row = ("big", "€" * (COPY_BUFFER_SIZE // 2 + 7), "x", "", 0, None)
+
+        def serialize(batch):
+            buffer = io.StringIO()
+            for row in batch:
+                buffer.write("\t".join(map(_copy_value, row)))
+                buffer.write("\n")
+            return buffer.getvalue().encode()
+
+        checks = [(rows, 1, 1), (rows, 7, 5), (rows, 64, 1000), (rows + [big_row], COPY_BUFFER_SIZE, 8192)]
+        for batch, buffer_size, read_size in checks:
+            reader = io.BufferedReader(_RowReader(batch), buffer_size=buffer_size)
+            actual = b"".join(iter(lambda: reader.read(read_size), b""))
+            if actual != serialize(batch):
+                raise AssertionError(
+                    f"_RowReader output differs from StringIO serialization "
+                    f"(buffer_size={buffer_size}, read_size={read_size})"
+                )
 
-        return posts_batches, comments_batches
+        if _RowReader([]).read() != b"":
+            raise AssertionError("_RowReader of no rows is not empty")
+
+        logger.info(f"Streamed COPY data matches for {len(checks)} buffer sizes")
+        return True
 
     except Exception as e:
         logger.error(f"Test failed: {e}")
@@ -102,27 +248,49 @@ def test_data_transformation(posts, comments):
 
 def main():
     """Run all local tests."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("-q", "--quiet", action="store_true", help="only log errors")
+    arg_parser.add_argument(
+        "--no-strict", dest="strict", action="store_false",
+        help="keep invalid records in the parser and filter them with the DataTransformer validators"
+    )
+    args = arg_parser.parse_args()
+
+    if args.quiet:
+        set_level(logging.ERROR)
+
     try:
         # Test 1: JSON Parsing
-        posts, comments = test_json_parsing()
+        posts, comments, parser = test_json_parsing(strict_validate=args.strict)
 
         # Test 2: Data Transformation
-        posts_batches, comments_batches = test_data_transformation(posts, comments)
+        test_data_transformation(posts, comments, parser)
+
+        # Test 3: COPY serialization
+        copy_tested = test_copy_serialization()
 
         # Summary
-        logger.info("\n" + "=" * 80)
+        logger.info(_NL_SEP)
         logger.info("TEST SUMMARY")
-        logger.info("=" * 80)
+        logger.info(_SEP)
         logger.info("✓ JSON parsing successful")
-        logger.info("✓ Data validation successful")
+        logger.info("✓ Streamed parsing matches")
+        if parser.strict_validate:
+            logger.info("✓ Records validated by the parser")
+        else:
+            logger.info("✓ Data validation successful")
         logger.info("✓ Batch creation successful")
+        if copy_tested:
+            logger.info("✓ COPY serialization successful")
+        else:
+            logger.info("- COPY serialization skipped (psycopg2 not installed)")
         logger.info("\nAll tests passed!")
-        logger.info("=" * 80)
+        logger.info(_SEP)
 
     except Exception as e:
-        logger.error("\n" + "=" * 80)
+        logger.error(_NL_SEP)
         logger.error("TESTS FAILED")
-        logger.error("=" * 80)
+        logger.error(_SEP)
         logger.error(f"Error: {e}")
         raise
 